@@ -3,17 +3,25 @@
 Focused on rail-only: Subway, Light Rail (Green Line), and Commuter Rail."""
 
 import csv
+import http.client
 import json
 import os
-import urllib.request
+import sys
+from array import array
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
+from itertools import accumulate
 
 DATA_DIR = "Alerts_2025"
 OUTPUT = "alerts_data.json"
 
+MBTA_API_HOST = "api-v3.mbta.com"
+SHAPE_BATCH_SIZE = 10  # route ids per route_patterns request
+
 # Only include rail route types
-RAIL_ROUTE_TYPES = {"0", "1", "2"}  # 0=Light Rail, 1=Subway, 2=Commuter Rail
+RAIL_ROUTE_TYPES = frozenset({"0", "1", "2"})  # 0=Light Rail, 1=Subway, 2=Commuter Rail
 
 ROUTE_TYPE_NAMES = {
     "0": "Green Line",
@@ -126,6 +134,15 @@ EFFECT_DISPLAY = {
     "FARE_CHANGE": "Fare Change",
 }
 
+# Codes and display names end up as lookup/aggregation keys for every row;
+# intern both sides once so interned row values compare by identity
+for _table in (ROUTE_TYPE_NAMES, ROUTE_COLORS, ROUTE_DISPLAY_NAMES, CAUSE_DETAIL_DISPLAY,
+               CAUSE_DISPLAY, EFFECT_DETAIL_DISPLAY, EFFECT_DISPLAY):
+    _interned = {sys.intern(_k): sys.intern(_v) for _k, _v in _table.items()}
+    _table.clear()
+    _table.update(_interned)
+del _table, _interned
+
 
 def parse_dt(s):
     if not s:
@@ -140,98 +157,106 @@ def display_cause(cause, cause_detail=""):
     """Prefer cause_detail for richer categorization; fall back to cause."""
     # Try detail field first (unless it's just UNKNOWN_CAUSE echoed back)
     if cause_detail and cause_detail != "UNKNOWN_CAUSE":
-        if cause_detail in CAUSE_DETAIL_DISPLAY:
-            return CAUSE_DETAIL_DISPLAY[cause_detail]
+        name = CAUSE_DETAIL_DISPLAY.get(cause_detail)
+        if name is not None:
+            return name
     # Fall back to generic cause
-    return CAUSE_DISPLAY.get(cause, cause.replace("_", " ").title() if cause else "Unknown")
+    name = CAUSE_DISPLAY.get(cause)
+    if name is not None:
+        return name
+    return sys.intern(cause.replace("_", " ").title()) if cause else "Unknown"
 
 
 def display_effect(effect, effect_detail=""):
     """Prefer effect_detail for richer categorization; fall back to effect."""
-    if effect_detail and effect_detail in EFFECT_DETAIL_DISPLAY:
-        return EFFECT_DETAIL_DISPLAY[effect_detail]
-    return EFFECT_DISPLAY.get(effect, effect.replace("_", " ").title() if effect else "Unknown")
+    if effect_detail:
+        name = EFFECT_DETAIL_DISPLAY.get(effect_detail)
+        if name is not None:
+            return name
+    name = EFFECT_DISPLAY.get(effect)
+    if name is not None:
+        return name
+    return sys.intern(effect.replace("_", " ").title()) if effect else "Unknown"
 
 
 # ── Google Encoded Polyline Decoder ──
 def decode_polyline(encoded):
     """Decode a Google encoded polyline string into list of [lng, lat] (GeoJSON order)."""
-    coords = []
-    index = 0
-    lat = 0
-    lng = 0
-    while index < len(encoded):
-        # Decode latitude
-        shift = 0
-        result = 0
-        while True:
-            b = ord(encoded[index]) - 63
-            index += 1
-            result |= (b & 0x1F) << shift
-            shift += 5
-            if b < 0x20:
-                break
-        lat += (~(result >> 1) if (result & 1) else (result >> 1))
-
-        # Decode longitude
-        shift = 0
-        result = 0
-        while True:
-            b = ord(encoded[index]) - 63
-            index += 1
-            result |= (b & 0x1F) << shift
+    # Single flat pass over the bytes collecting the zigzag-decoded varints
+    # (alternating lat/lng deltas); the running sums are left to accumulate().
+    deltas = []
+    result = 0
+    shift = 0
+    for b in encoded.encode("ascii"):
+        b -= 63
+        result |= (b & 0x1F) << shift
+        if b < 0x20:
+            deltas.append(~(result >> 1) if (result & 1) else (result >> 1))
+            result = 0
+            shift = 0
+        else:
             shift += 5
-            if b < 0x20:
-                break
-        lng += (~(result >> 1) if (result & 1) else (result >> 1))
-
-        coords.append([lng / 1e5, lat / 1e5])  # GeoJSON: [lng, lat]
-    return coords
+    if shift or len(deltas) % 2:
+        raise ValueError("truncated polyline: unterminated value or unpaired latitude")
+    lats = accumulate(deltas[0::2])
+    lngs = accumulate(deltas[1::2])
+    return [[lng / 1e5, lat / 1e5] for lat, lng in zip(lats, lngs)]  # GeoJSON: [lng, lat]
 
 
 def fetch_route_shapes(route_ids):
     """Fetch canonical route shapes from the MBTA V3 API and return GeoJSON."""
-    route_list = ",".join(route_ids)
-    # direction_id=0 gives us one direction per pattern (avoid duplicates)
-    url = (
-        f"https://api-v3.mbta.com/route_patterns"
-        f"?filter[route]={route_list}"
-        f"&filter[canonical]=true"
-        f"&filter[direction_id]=0"
-        f"&include=representative_trip.shape"
-        f"&fields[shape]=polyline"
-    )
-
-    print(f"  Fetching shapes from MBTA API...")
-    print(f"  URL: {url[:100]}...")
-
-    req = urllib.request.Request(url, headers={"Accept": "application/vnd.api+json"})
-    with urllib.request.urlopen(req, timeout=30) as resp:
-        data = json.loads(resp.read().decode())
-
-    # Build shape lookup: shape_id -> polyline
-    shape_lookup = {}
-    for item in data.get("included", []):
-        if item["type"] == "shape":
-            shape_lookup[item["id"]] = item["attributes"]["polyline"]
-
-    # Build trip -> shape lookup
-    trip_shape = {}
-    for item in data.get("included", []):
-        if item["type"] == "trip":
-            shape_ref = item.get("relationships", {}).get("shape", {}).get("data")
-            if shape_ref:
-                trip_shape[item["id"]] = shape_ref["id"]
+    # Batch the route filter (keeps URLs short) and reuse one keep-alive
+    # HTTPS connection for all batches instead of a new TLS handshake each.
+    batches = [route_ids[i:i + SHAPE_BATCH_SIZE] for i in range(0, len(route_ids), SHAPE_BATCH_SIZE)]
+    print(f"  Fetching shapes from MBTA API ({len(batches)} requests)...")
+
+    route_patterns = []
+    shape_lookup = {}  # shape_id -> polyline
+    trip_shape = {}  # trip_id -> shape_id
+    conn = http.client.HTTPSConnection(MBTA_API_HOST, timeout=30)
+    try:
+        for batch in batches:
+            # direction_id=0 gives us one direction per pattern (avoid duplicates)
+            path = (
+                f"/route_patterns"
+                f"?filter[route]={','.join(batch)}"
+                f"&filter[canonical]=true"
+                f"&filter[direction_id]=0"
+                f"&include=representative_trip.shape"
+                f"&fields[shape]=polyline"
+            )
+            print(f"  URL: https://{MBTA_API_HOST}{path[:80]}...")
+            conn.request("GET", path, headers={"Accept": "application/vnd.api+json"})
+            resp = conn.getresponse()
+            body = resp.read()  # must be drained before the connection is reused
+            if resp.status != 200:
+                raise RuntimeError(f"HTTP {resp.status} {resp.reason}")
+            page = json.loads(body.decode())
+            route_patterns.extend(page.get("data", []))
+            # One pass over included resources builds both lookups
+            for item in page.get("included", []):
+                item_type = item["type"]
+                if item_type == "shape":
+                    shape_lookup[item["id"]] = item["attributes"]["polyline"]
+                elif item_type == "trip":
+                    shape_ref = item.get("relationships", {}).get("shape", {}).get("data")
+                    if shape_ref:
+                        trip_shape[item["id"]] = shape_ref["id"]
+    finally:
+        conn.close()
 
     # Map route_patterns -> route_id -> list of polylines
     route_polylines = defaultdict(list)
-    for rp in data.get("data", []):
+    decoded = {}  # shape_id -> coords; patterns can share a representative shape
+    for rp in route_patterns:
         route_id = rp["relationships"]["route"]["data"]["id"]
         trip_ref = rp.get("relationships", {}).get("representative_trip", {}).get("data")
         if trip_ref and trip_ref["id"] in trip_shape:
             shape_id = trip_shape[trip_ref["id"]]
             if shape_id in shape_lookup:
-                coords = decode_polyline(shape_lookup[shape_id])
+                coords = decoded.get(shape_id)
+                if coords is None:
+                    coords = decoded[shape_id] = decode_polyline(shape_lookup[shape_id])
                 if coords:
                     route_polylines[route_id].append(coords)
 
@@ -264,58 +289,138 @@ def fetch_route_shapes(route_ids):
     return {"type": "FeatureCollection", "features": features}
 
 
-def main():
-    print("Reading CSV files (rail-only)...")
-    alerts = {}
-    records = []
+def read_alert_file(filepath):
+    """Parse one monthly CSV, deduplicating alerts within the file.
 
-    csv_files = sorted(f for f in os.listdir(DATA_DIR) if f.endswith(".csv"))
+    Runs in a worker process, so everything returned is a plain dict/set.
+    Each of the ``first_*`` dicts maps a seen_* key to the record of its first
+    occurrence (in file order); main() applies the cross-file dedup.
+    Records are (month, dow, hour, rt_name, cause, effect, sev, route_id,
+    duration_hours).
+    """
+    alerts_latest_mod = {}  # alert_id -> latest last_modified_dt
+    months_set = set()
+    rt_names_set = set()
+    n_records = 0
     skipped = 0
+    first_global = {}
+    first_per_rt = {}
+    first_heatmap = {}
+    first_heatmap_rt = {}
+    first_route = {}
+
+    with open(filepath, encoding="utf-8") as f:
+        # Plain csv.reader + column indices: no per-row dict allocation
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            # Zero-byte or header-less file: no rows, as with DictReader
+            rows = ()
+        else:
+            rows = reader
+            idx = {name: i for i, name in enumerate(header)}
+            ncols = len(header)
+            (i_rt, i_aid, i_mod, i_start_dt, i_end_dt, i_cause, i_cause_d,
+             i_effect, i_effect_d, i_sev, i_route, i_start_date) = (
+                idx["route_type"], idx["alert_id"], idx["last_modified_dt"],
+                idx["active_period_start_dt"], idx["active_period_end_dt"],
+                idx["cause"], idx["cause_detail"], idx["effect"], idx["effect_detail"],
+                idx["severity_level"], idx["route_id"], idx["active_period_start_date"],
+            )
+        # Bind globals/methods used per row to locals (LOAD_FAST in the loop)
+        rail_types = RAIL_ROUTE_TYPES
+        rt_name_of = ROUTE_TYPE_NAMES.get
+        intern = sys.intern
+        # Only a few dozen distinct raw (code, detail) pairs occur; memoise them
+        cause_cache = {}
+        effect_cache = {}
+        parse = parse_dt
+        for row in rows:
+            if not row:  # blank line; DictReader skipped these too
+                continue
+            if len(row) < ncols:  # short line: missing fields read as empty
+                row += [""] * (ncols - len(row))
+            rt = row[i_rt]
+            if rt not in rail_types:
+                skipped += 1
+                continue
+
+            aid = row[i_aid]
+            mod_dt = row[i_mod]
+            if aid not in alerts_latest_mod or mod_dt > alerts_latest_mod[aid]:
+                alerts_latest_mod[aid] = mod_dt
+
+            # fromisoformat is C and cheap; it's strftime that was costly, so the
+            # month key is formatted from the datetime fields instead
+            start_dt = parse(row[i_start_dt])
+            if not start_dt:
+                continue
+            month = intern(f"{start_dt.year:04d}-{start_dt.month:02d}")
+            dow = start_dt.weekday()
+            hour = start_dt.hour
+
+            n_records += 1
+            rt_name = rt_name_of(rt, "Other")
+            key = (row[i_cause], row[i_cause_d])
+            cause = cause_cache.get(key)
+            if cause is None:
+                cause = cause_cache[key] = display_cause(*key)
+            key = (row[i_effect], row[i_effect_d])
+            effect = effect_cache.get(key)
+            if effect is None:
+                effect = effect_cache[key] = display_effect(*key)
+            sev = intern(row[i_sev] or "INFO")
+            route_id = intern(row[i_route])
+            start_date = intern(row[i_start_date])
+            duration_hours = None
+            if row[i_end_dt]:
+                end_dt = parse(row[i_end_dt])
+                if end_dt and end_dt > start_dt:
+                    duration_hours = (end_dt - start_dt).total_seconds() / 3600
+            months_set.add(month)
+            rt_names_set.add(rt_name)
+
+            rec = (month, dow, hour, rt_name, cause, effect, sev, route_id, duration_hours)
+            # Compound string keys hash once, unlike per-element tuple hashing
+            global_key = f"{aid}|{month}"
+            rt_key = f"{global_key}|{rt_name}"
+            if global_key not in first_global:
+                first_global[global_key] = rec
+            if rt_key not in first_per_rt:
+                first_per_rt[rt_key] = rec
+            if start_date:
+                hm_key = f"{aid}|{start_date}"
+                hm_rt_key = f"{hm_key}|{rt_name}"
+                if hm_key not in first_heatmap:
+                    first_heatmap[hm_key] = rec
+                if hm_rt_key not in first_heatmap_rt:
+                    first_heatmap_rt[hm_rt_key] = rec
+            if route_id:
+                route_key = f"{global_key}|{route_id}"
+                if route_key not in first_route:
+                    first_route[route_key] = rec
+
+    return {
+        "alerts_latest_mod": alerts_latest_mod,
+        "months": months_set,
+        "rt_names": rt_names_set,
+        "n_records": n_records,
+        "skipped": skipped,
+        "first_global": first_global,
+        "first_per_rt": first_per_rt,
+        "first_heatmap": first_heatmap,
+        "first_heatmap_rt": first_heatmap_rt,
+        "first_route": first_route,
+    }
 
-    for fname in csv_files:
-        print(f"  Processing {fname}...")
-        filepath = os.path.join(DATA_DIR, fname)
-        with open(filepath, encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                rt = row.get("route_type", "")
-                if rt not in RAIL_ROUTE_TYPES:
-                    skipped += 1
-                    continue
 
-                aid = row["alert_id"]
-                mod_dt = row["last_modified_dt"] or ""
-                if aid not in alerts or mod_dt > alerts[aid]["last_modified_dt"]:
-                    alerts[aid] = row
-
-                start_dt = parse_dt(row.get("active_period_start_dt", ""))
-                end_dt = parse_dt(row.get("active_period_end_dt", ""))
-                if start_dt:
-                    rt_name = ROUTE_TYPE_NAMES.get(rt, "Other")
-                    duration_hours = None
-                    if end_dt and end_dt > start_dt:
-                        duration_hours = (end_dt - start_dt).total_seconds() / 3600
-                    records.append((
-                        aid,
-                        start_dt.strftime("%Y-%m"),
-                        start_dt.weekday(),
-                        start_dt.hour,
-                        rt_name,
-                        display_cause(row.get("cause", ""), row.get("cause_detail", "")),
-                        display_effect(row.get("effect", ""), row.get("effect_detail", "")),
-                        row.get("severity_level", "") or "INFO",
-                        row.get("route_id", ""),
-                        row.get("active_period_start_date", ""),
-                        duration_hours,
-                    ))
-
-    print(f"  Unique rail alerts: {len(alerts)}")
-    print(f"  Rail records: {len(records)}, skipped non-rail: {skipped}")
-
-    # ── Aggregations ──
-    print("Building aggregations...")
-    months = sorted(set(r[1] for r in records))
-    all_rt_names = sorted(set(r[4] for r in records))
+def main():
+    print("Reading CSV files (rail-only)...")
+    alerts_latest_mod = {}  # alert_id -> latest last_modified_dt
+    months_set = set()
+    rt_names_set = set()
+    n_records = 0
+    skipped = 0
 
     g_monthly_cause = defaultdict(lambda: defaultdict(int))
     g_monthly_sev = defaultdict(lambda: defaultdict(int))
@@ -323,26 +428,26 @@ def main():
     g_monthly_effect = defaultdict(lambda: defaultdict(int))
     g_cause_totals = defaultdict(int)
     g_effect_totals = defaultdict(int)
-    g_sev_totals = defaultdict(int)
-    g_heatmap = defaultdict(int)
+    g_heatmap = array("I", [0] * 7 * 24)  # flat day-of-week x hour grid, index dow * 24 + hour
 
-    rt_monthly_cause = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
-    rt_monthly_sev = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
-    rt_monthly_effect = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
+    # Flat (rt_name, month, category) -> count; avoids a nested dict per route type/month
+    rt_monthly_cause = defaultdict(int)
+    rt_monthly_sev = defaultdict(int)
+    rt_monthly_effect = defaultdict(int)
     rt_cause_totals = defaultdict(lambda: defaultdict(int))
     rt_effect_totals = defaultdict(lambda: defaultdict(int))
-    rt_heatmap = defaultdict(lambda: defaultdict(int))
+    rt_heatmap = defaultdict(lambda: array("I", [0] * 7 * 24))
 
     route_stats = defaultdict(lambda: {
         "count": 0, "causes": defaultdict(int), "effects": defaultdict(int),
         "severities": defaultdict(int), "route_type": "", "months": defaultdict(int),
-        "durations": [],
+        "durations": array("d"),
         "monthly_sev": defaultdict(lambda: defaultdict(int)),  # month -> sev -> count
     })
 
-    # Duration tracking
-    g_durations = []
-    rt_durations = defaultdict(list)
+    # Duration tracking: packed C doubles rather than lists of float objects
+    g_durations = array("d")
+    rt_durations = defaultdict(lambda: array("d"))
 
     seen_global = set()
     seen_per_rt = set()
@@ -350,46 +455,100 @@ def main():
     seen_heatmap_rt = set()
     seen_route = set()
 
-    for aid, month, dow, hour, rt_name, cause, effect, sev, route_id, start_date, duration_hours in records:
-        global_key = (aid, month)
-        rt_key = (aid, month, rt_name)
-
-        if global_key not in seen_global:
-            seen_global.add(global_key)
-            g_monthly_cause[month][cause] += 1
-            g_monthly_sev[month][sev] += 1
-            g_monthly_rt[month][rt_name] += 1
-            g_monthly_effect[month][effect] += 1
-            g_cause_totals[cause] += 1
-            g_effect_totals[effect] += 1
-            g_sev_totals[sev] += 1
-            if duration_hours is not None and duration_hours < 720:  # Cap at 30 days
-                g_durations.append(duration_hours)
-
-        if rt_key not in seen_per_rt:
-            seen_per_rt.add(rt_key)
-            rt_monthly_cause[rt_name][month][cause] += 1
-            rt_monthly_sev[rt_name][month][sev] += 1
-            rt_monthly_effect[rt_name][month][effect] += 1
-            rt_cause_totals[rt_name][cause] += 1
-            rt_effect_totals[rt_name][effect] += 1
-            if duration_hours is not None and duration_hours < 720:
-                rt_durations[rt_name].append(duration_hours)
-
-        if start_date:
-            hm_key = (aid, start_date)
-            hm_rt_key = (aid, start_date, rt_name)
-            if hm_key not in seen_heatmap:
-                seen_heatmap.add(hm_key)
-                g_heatmap[(dow, hour)] += 1
-            if hm_rt_key not in seen_heatmap_rt:
-                seen_heatmap_rt.add(hm_rt_key)
-                rt_heatmap[rt_name][(dow, hour)] += 1
-
-        if route_id:
-            route_key = (aid, month, route_id)
-            if route_key not in seen_route:
-                seen_route.add(route_key)
+    # Bound methods for the merge loops below
+    sg_add = seen_global.add
+    sp_add = seen_per_rt.add
+    sh_add = seen_heatmap.add
+    shr_add = seen_heatmap_rt.add
+    sr_add = seen_route.add
+    g_dur_append = g_durations.append
+    intern = sys.intern
+
+    localized = {}  # id(rec) -> re-interned rec, reset for each worker result
+
+    def localize(rec):
+        # Strings unpickled from a worker are fresh objects; re-intern them so
+        # the counters below (and the ROUTE_* tables) compare by identity again.
+        # One rec object is shared by several first_* dicts, so memoise by id.
+        out = localized.get(id(rec))
+        if out is None:
+            month, dow, hour, rt_name, cause, effect, sev, route_id, duration_hours = rec
+            out = localized[id(rec)] = (
+                intern(month), dow, hour, intern(rt_name), intern(cause), intern(effect),
+                intern(sev), intern(route_id), duration_hours,
+            )
+        return out
+
+    csv_files = sorted(f for f in os.listdir(DATA_DIR) if f.endswith(".csv"))
+    paths = [os.path.join(DATA_DIR, fname) for fname in csv_files]
+
+    # Files are parsed in parallel; results come back in file order, so merging
+    # them here gives the same first-occurrence dedup as a sequential read.
+    # With one file or one CPU the pickling overhead buys nothing: parse in-process.
+    parallel = len(paths) > 1 and (os.cpu_count() or 1) > 1
+    with ProcessPoolExecutor() if parallel else nullcontext() as ex:
+        parts = ex.map(read_alert_file, paths) if parallel else map(read_alert_file, paths)
+        for fname, part in zip(csv_files, parts):
+            print(f"  Processing {fname}...")
+            localized.clear()  # ids are only stable while this part is alive
+            for aid, mod_dt in part["alerts_latest_mod"].items():
+                if aid not in alerts_latest_mod or mod_dt > alerts_latest_mod[aid]:
+                    alerts_latest_mod[aid] = mod_dt
+            months_set.update(map(intern, part["months"]))
+            rt_names_set.update(map(intern, part["rt_names"]))
+            n_records += part["n_records"]
+            skipped += part["skipped"]
+
+            for key, rec in part["first_global"].items():
+                if key in seen_global:
+                    continue
+                sg_add(key)
+                if parallel:
+                    rec = localize(rec)
+                month, _, _, rt_name, cause, effect, sev, _, duration_hours = rec
+                g_monthly_cause[month][cause] += 1
+                g_monthly_sev[month][sev] += 1
+                g_monthly_rt[month][rt_name] += 1
+                g_monthly_effect[month][effect] += 1
+                g_cause_totals[cause] += 1
+                g_effect_totals[effect] += 1
+                if duration_hours is not None and duration_hours < 720:  # Cap at 30 days
+                    g_dur_append(duration_hours)
+
+            for key, rec in part["first_per_rt"].items():
+                if key in seen_per_rt:
+                    continue
+                sp_add(key)
+                if parallel:
+                    rec = localize(rec)
+                month, _, _, rt_name, cause, effect, sev, _, duration_hours = rec
+                rt_monthly_cause[(rt_name, month, cause)] += 1
+                rt_monthly_sev[(rt_name, month, sev)] += 1
+                rt_monthly_effect[(rt_name, month, effect)] += 1
+                rt_cause_totals[rt_name][cause] += 1
+                rt_effect_totals[rt_name][effect] += 1
+                if duration_hours is not None and duration_hours < 720:
+                    rt_durations[rt_name].append(duration_hours)
+
+            for key, rec in part["first_heatmap"].items():
+                if key not in seen_heatmap:
+                    sh_add(key)
+                    g_heatmap[rec[1] * 24 + rec[2]] += 1
+
+            for key, rec in part["first_heatmap_rt"].items():
+                if key not in seen_heatmap_rt:
+                    shr_add(key)
+                    if parallel:
+                        rec = localize(rec)
+                    rt_heatmap[rec[3]][rec[1] * 24 + rec[2]] += 1
+
+            for key, rec in part["first_route"].items():
+                if key in seen_route:
+                    continue
+                sr_add(key)
+                if parallel:
+                    rec = localize(rec)
+                month, _, _, rt_name, cause, effect, sev, route_id, duration_hours = rec
                 rs = route_stats[route_id]
                 rs["count"] += 1
                 rs["causes"][cause] += 1
@@ -402,6 +561,12 @@ def main():
                 if duration_hours is not None and duration_hours < 720:
                     rs["durations"].append(duration_hours)
 
+    print(f"  Unique rail alerts: {len(alerts_latest_mod)}")
+    print(f"  Rail records: {n_records}, skipped non-rail: {skipped}")
+
+    months = sorted(months_set)
+    all_rt_names = sorted(rt_names_set)
+
     # ── Duration stats helper ──
     def duration_stats(durations_list):
         if not durations_list:
@@ -421,27 +586,37 @@ def main():
     top_causes = [c for c, _ in sorted(g_cause_totals.items(), key=lambda x: -x[1])]
     top_effects = [e for e, _ in sorted(g_effect_totals.items(), key=lambda x: -x[1])]
 
+    empty = {}
+
     def build_series(monthly_dict, categories):
-        return {cat: [monthly_dict[m].get(cat, 0) for m in months] for cat in categories}
+        # Resolve each month's counts once, not once per category
+        month_counts = [monthly_dict.get(m, empty) for m in months]
+        return {cat: [mc.get(cat, 0) for mc in month_counts] for cat in categories}
+
+    def build_rt_series(flat_dict, rt, categories):
+        get = flat_dict.get
+        return {cat: [get((rt, m, cat), 0) for m in months] for cat in categories}
 
     def build_heatmap(hm):
-        return [[hm.get((d, h), 0) for h in range(24)] for d in range(7)]
-
-    by_route_type = {}
-    for rt in all_rt_names:
-        rt_causes = [c for c, _ in sorted(rt_cause_totals[rt].items(), key=lambda x: -x[1])]
-        rt_effects = [e for e, _ in sorted(rt_effect_totals[rt].items(), key=lambda x: -x[1])]
-        by_route_type[rt] = {
-            "causes": rt_causes,
-            "effects": rt_effects,
-            "causeTotals": dict(rt_cause_totals[rt]),
-            "effectTotals": dict(rt_effect_totals[rt]),
-            "monthlyCause": build_series(rt_monthly_cause[rt], rt_causes),
-            "monthlySeverity": build_series(rt_monthly_sev[rt], ["INFO", "WARNING", "SEVERE"]),
-            "monthlyEffect": build_series(rt_monthly_effect[rt], rt_effects),
-            "heatmap": build_heatmap(rt_heatmap[rt]),
-            "duration": duration_stats(rt_durations[rt]),
-        }
+        return [hm[d * 24:(d + 1) * 24].tolist() for d in range(7)]
+
+    def build_by_route_type():
+        by_route_type = {}
+        for rt in all_rt_names:
+            rt_causes = [c for c, _ in sorted(rt_cause_totals[rt].items(), key=lambda x: -x[1])]
+            rt_effects = [e for e, _ in sorted(rt_effect_totals[rt].items(), key=lambda x: -x[1])]
+            by_route_type[rt] = {
+                "causes": rt_causes,
+                "effects": rt_effects,
+                "causeTotals": dict(rt_cause_totals[rt]),
+                "effectTotals": dict(rt_effect_totals[rt]),
+                "monthlyCause": build_rt_series(rt_monthly_cause, rt, rt_causes),
+                "monthlySeverity": build_rt_series(rt_monthly_sev, rt, ["INFO", "WARNING", "SEVERE"]),
+                "monthlyEffect": build_rt_series(rt_monthly_effect, rt, rt_effects),
+                "heatmap": build_heatmap(rt_heatmap[rt]),
+                "duration": duration_stats(rt_durations[rt]),
+            }
+        return by_route_type
 
     sev_weights = {"INFO": 1, "WARNING": 2, "SEVERE": 3}
     route_table = []
@@ -461,10 +636,7 @@ def main():
             "warning": rs["severities"].get("WARNING", 0),
             "info": rs["severities"].get("INFO", 0),
             "months": {m: rs["months"].get(m, 0) for m in months},
-            "monthlySev": {
-                sev_level: [rs["monthly_sev"][m].get(sev_level, 0) for m in months]
-                for sev_level in ["SEVERE", "WARNING", "INFO"]
-            },
+            "monthlySev": build_series(rs["monthly_sev"], ["SEVERE", "WARNING", "INFO"]),
             "color": ROUTE_COLORS.get(rid, "#80276C"),
             "displayName": ROUTE_DISPLAY_NAMES.get(rid, rid),
             "duration": duration_stats(rs["durations"]),
@@ -480,35 +652,52 @@ def main():
         print(f"  Dashboard will work without map.")
         route_shapes = {"type": "FeatureCollection", "features": []}
 
-    output = {
-        "generated": datetime.now().isoformat(),
-        "dataRange": {"from": months[0] if months else "", "to": months[-1] if months else ""},
-        "summary": {
-            "totalAlerts": len(alerts),
+    # Top-level output keys, each built only when it is written so no
+    # complete copy of the output has to be held in memory at once
+    output_fields = [
+        ("generated", lambda: datetime.now().isoformat()),
+        ("dataRange", lambda: {"from": months[0] if months else "", "to": months[-1] if months else ""}),
+        ("summary", lambda: {
+            "totalAlerts": len(alerts_latest_mod),
             "totalAlertMonths": len(seen_global),
             "topRoute": route_table[0]["id"] if route_table else "",
             "topCause": top_causes[0] if top_causes else "",
-        },
-        "months": months,
-        "daysPerMonth": DAYS_PER_MONTH_2025,
-        "causes": top_causes,
-        "effects": top_effects,
-        "causeTotals": dict(g_cause_totals),
-        "effectTotals": dict(g_effect_totals),
-        "monthlyCause": build_series(g_monthly_cause, top_causes),
-        "monthlySeverity": build_series(g_monthly_sev, ["INFO", "WARNING", "SEVERE"]),
-        "monthlyRouteType": build_series(g_monthly_rt, all_rt_names),
-        "monthlyEffect": build_series(g_monthly_effect, top_effects),
-        "heatmap": build_heatmap(g_heatmap),
-        "byRouteType": by_route_type,
-        "routeTable": route_table,
-        "routeTypeNames": list(ROUTE_TYPE_NAMES.values()),
-        "routeShapes": route_shapes,
-        "duration": duration_stats(g_durations),
-    }
-
-    with open(OUTPUT, "w") as f:
-        json.dump(output, f)
+        }),
+        ("months", lambda: months),
+        ("daysPerMonth", lambda: DAYS_PER_MONTH_2025),
+        ("causes", lambda: top_causes),
+        ("effects", lambda: top_effects),
+        ("causeTotals", lambda: g_cause_totals),
+        ("effectTotals", lambda: g_effect_totals),
+        ("monthlyCause", lambda: build_series(g_monthly_cause, top_causes)),
+        ("monthlySeverity", lambda: build_series(g_monthly_sev, ["INFO", "WARNING", "SEVERE"])),
+        ("monthlyRouteType", lambda: build_series(g_monthly_rt, all_rt_names)),
+        ("monthlyEffect", lambda: build_series(g_monthly_effect, top_effects)),
+        ("heatmap", lambda: build_heatmap(g_heatmap)),
+        ("byRouteType", build_by_route_type),
+        ("routeTable", lambda: route_table),
+        ("routeTypeNames", lambda: list(ROUTE_TYPE_NAMES.values())),
+        ("routeShapes", lambda: route_shapes),
+        ("duration", lambda: duration_stats(g_durations)),
+    ]
+
+    # Stream into a temp file beside OUTPUT and swap it in only once complete,
+    # so a failing builder never leaves a truncated alerts_data.json behind
+    tmp_output = OUTPUT + ".tmp"
+    try:
+        with open(tmp_output, "w") as f:
+            f.write("{")
+            for i, (key, build) in enumerate(output_fields):
+                if i:
+                    f.write(",")
+                f.write(f"{json.dumps(key)}:")
+                json.dump(build(), f, separators=(",", ":"))  # compact: no whitespace
+            f.write("}")
+        os.replace(tmp_output, OUTPUT)
+    except BaseException:
+        if os.path.exists(tmp_output):
+            os.remove(tmp_output)
+        raise
 
     size_mb = os.path.getsize(OUTPUT) / 1024 / 1024
     print(f"Done! Wrote {OUTPUT} ({size_mb:.2f} MB)")